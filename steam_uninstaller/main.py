@@ -48,7 +48,7 @@ Examples:
 
     # List mode
     if args.list_games:
-        games = get_all_installed_games()
+        games = get_all_installed_games(steam_root)
         if not games:
             print("No installed games found.")
             return 0
@@ -1,11 +1,65 @@
 """Steam library detection and game parsing."""
 
+import heapq
+import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache, partial
+from itertools import zip_longest
 from pathlib import Path
 
+# Units used by format_size, in steps of 1024
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
 
-@dataclass
+# Upper bound on threads used to read manifests concurrently
+MAX_SCAN_WORKERS = 8
+
+# AppState fields read from appmanifest files
+MANIFEST_KEYS = frozenset({"appid", "name", "installdir", "SizeOnDisk"})
+
+# Appids of Steam tools and runtimes, skipped without reading their manifest
+_NON_GAME_APPIDS = frozenset({
+    "228980",   # Steamworks Common Redistributables
+    "1070560",  # Steam Linux Runtime (scout)
+    "1391110",  # Steam Linux Runtime - Soldier
+    "1628350",  # Steam Linux Runtime - Sniper
+    "1161040",  # Proton BattlEye Runtime
+    "1826330",  # Proton EasyAntiCheat Runtime
+    "858280",   # Proton 3.7
+    "930400",   # Proton 3.7 Beta
+    "961940",   # Proton 3.16
+    "1113280",  # Proton 4.11
+    "1245040",  # Proton 5.0
+    "1420170",  # Proton 5.13
+    "1580130",  # Proton 6.3
+    "1887720",  # Proton 7.0
+    "2348590",  # Proton 8.0
+    "2805730",  # Proton 9.0
+    "1493710",  # Proton Experimental
+    "2180100",  # Proton Hotfix
+})
+
+# Sections of localconfig.vdf enclosing the per-app settings
+_APPS_SECTION = ("UserLocalConfigStore", "Software", "Valve", "Steam", "apps")
+
+# Matches the library paths in libraryfolders.vdf
+_LIB_PATH_RE = re.compile(r'"path"\s+"([^"]+)"')
+
+# Process names that identify a running Steam client
+STEAM_PROCESS_NAMES = ("steam", "steam.exe")
+
+# How long (in seconds) an is_steam_running() result is reused
+STEAM_RUNNING_TTL = 5.0
+
+_steam_running_cache: tuple[float, bool] | None = None
+
+# Directory listings backing SteamGame.has_compatdata/has_shadercache
+_dir_names_cache: dict[Path, set[str]] = {}
+
+
+@dataclass(frozen=True, slots=True)
 class SteamGame:
     """Represents an installed Steam game."""
 
@@ -14,10 +68,18 @@ class SteamGame:
     install_dir: str
     size_on_disk: int
     library_path: Path
-    has_compatdata: bool
-    has_shadercache: bool
     playtime_minutes: int = 0
 
+    @property
+    def has_compatdata(self) -> bool:
+        """Whether Proton compatibility data exists for this game."""
+        return self.appid in _cached_dir_names(self.library_path / "steamapps" / "compatdata")
+
+    @property
+    def has_shadercache(self) -> bool:
+        """Whether a shader cache exists for this game."""
+        return self.appid in _cached_dir_names(self.library_path / "steamapps" / "shadercache")
+
     @property
     def manifest_path(self) -> Path:
         """Path to the appmanifest file."""
@@ -40,12 +102,7 @@ class SteamGame:
 
     def format_size(self) -> str:
         """Return human-readable size string."""
-        size = self.size_on_disk
-        for unit in ["B", "KB", "MB", "GB", "TB"]:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} PB"
+        return format_size(self.size_on_disk)
 
     def format_playtime(self) -> str:
         """Return human-readable playtime string."""
@@ -55,6 +112,15 @@ class SteamGame:
         return f"{hours:.1f}h"
 
 
+def format_size(size: int) -> str:
+    """Return human-readable size string."""
+    if size <= 0:
+        return "0.0 B"
+    # Each unit is 10 bits wider than the previous one
+    i = min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * i)):.1f} {SIZE_UNITS[i]}"
+
+
 def parse_vdf(content: str) -> dict:
     """
     Parse Valve's VDF format into a Python dictionary.
@@ -70,44 +136,49 @@ def parse_vdf(content: str) -> dict:
     stack = [result]
     current_key = None
 
-    # Pattern to match quoted strings
-    token_pattern = re.compile(r'"([^"]*)"|\{|\}')
-
-    tokens = token_pattern.findall(content)
-    i = 0
-
-    # Re-scan with positions to handle braces
-    for match in token_pattern.finditer(content):
-        token = match.group()
-
-        if token == "{":
-            # Start new nested dict
-            if current_key is not None:
-                new_dict = {}
-                stack[-1][current_key] = new_dict
-                stack.append(new_dict)
-                current_key = None
-        elif token == "}":
-            # End current dict
-            if len(stack) > 1:
-                stack.pop()
+    # Splitting on quotes leaves quoted strings at odd indices and the
+    # whitespace/braces between them at even indices
+    parts = content.split('"')
+    gaps = parts[0::2]
+    values = parts[1::2]
+    if len(parts) % 2 == 0:
+        # Text after an unterminated quote can only hold braces
+        gaps[-1] += values.pop()
+
+    for gap, value in zip_longest(gaps, values):
+        if "{" in gap or "}" in gap:
+            for char in gap:
+                if char == "{":
+                    # Start new nested dict
+                    if current_key is not None:
+                        new_dict = {}
+                        stack[-1][current_key] = new_dict
+                        stack.append(new_dict)
+                        current_key = None
+                elif char == "}":
+                    # End current dict
+                    if len(stack) > 1:
+                        stack.pop()
+
+        if value is None:
+            break
+
+        if current_key is None:
+            current_key = value
         else:
-            # Quoted string - extract value
-            value = match.group(1)
-            if current_key is None:
-                current_key = value
-            else:
-                stack[-1][current_key] = value
-                current_key = None
+            stack[-1][current_key] = value
+            current_key = None
 
     return result
 
 
+@lru_cache(maxsize=1)
 def find_steam_root() -> Path | None:
     """
     Find the Steam installation directory.
 
-    Checks common locations on Linux.
+    Checks common locations on Linux. The result is cached for the lifetime
+    of the process.
     """
     candidates = [
         Path.home() / ".local" / "share" / "Steam",
@@ -134,18 +205,14 @@ def get_library_folders(steam_root: Path) -> list[Path]:
         return [steam_root]
 
     content = vdf_path.read_text()
-    data = parse_vdf(content)
-
-    libraries = []
 
     # The structure is: {"libraryfolders": {"0": {"path": "..."}, "1": {...}}}
-    library_data = data.get("libraryfolders", {})
-
-    for key, value in library_data.items():
-        if isinstance(value, dict) and "path" in value:
-            lib_path = Path(value["path"])
-            if lib_path.exists():
-                libraries.append(lib_path)
+    # and "path" keys only occur in the library entries
+    libraries = []
+    for path in _LIB_PATH_RE.findall(content):
+        lib_path = Path(path)
+        if lib_path.exists():
+            libraries.append(lib_path)
 
     # Ensure steam_root is included
     if steam_root not in libraries:
@@ -154,6 +221,65 @@ def get_library_folders(steam_root: Path) -> list[Path]:
     return libraries
 
 
+def _extract_playtime(content: str) -> dict[str, int]:
+    """
+    Extract appid -> Playtime pairs from localconfig.vdf content.
+
+    Tokenizing works like parse_vdf, but only the names of the open
+    sections are kept instead of building dicts, and scanning stops once
+    the UserLocalConfigStore/Software/Valve/Steam/apps section is closed.
+    "apps" sections anywhere else in the file are ignored.
+    """
+    playtime: dict[str, int] = {}
+
+    parts = content.split('"')
+    gaps = parts[0::2]
+    values = parts[1::2]
+
+    # Names of the open sections, and how many of them match _APPS_SECTION.
+    # Appids are sections directly under apps, so Playtime values are found
+    # one level deeper.
+    sections: list[str] = []
+    matched = 0
+    apps_depth = len(_APPS_SECTION)
+    key = None
+
+    for gap, value in zip_longest(gaps, values):
+        if "{" in gap or "}" in gap:
+            for char in gap:
+                if char == "{":
+                    if key is not None:
+                        depth = len(sections)
+                        if matched == depth < apps_depth and key == _APPS_SECTION[depth]:
+                            matched += 1
+                        sections.append(key)
+                        key = None
+                elif char == "}":
+                    if sections:
+                        sections.pop()
+                        if matched > len(sections):
+                            if matched == apps_depth:
+                                return playtime
+                            matched = len(sections)
+
+        if value is None:
+            break
+
+        if key is None:
+            key = value
+            continue
+
+        if key == "Playtime" and matched == apps_depth and len(sections) == apps_depth + 1:
+            appid = sections[-1]
+            try:
+                playtime[appid] = int(value)
+            except ValueError:
+                playtime.pop(appid, None)
+        key = None
+
+    return playtime
+
+
 def get_playtime_data(steam_root: Path) -> dict[str, int]:
     """
     Get playtime data from localconfig.vdf.
@@ -176,27 +302,12 @@ def get_playtime_data(steam_root: Path) -> dict[str, int]:
             continue
 
         try:
-            content = config_file.read_text()
-            data = parse_vdf(content)
-
-            # Navigate to Software/Valve/Steam/apps
-            apps = (
-                data.get("UserLocalConfigStore", {})
-                .get("Software", {})
-                .get("Valve", {})
-                .get("Steam", {})
-                .get("apps", {})
-            )
-
-            for appid, app_data in apps.items():
-                if isinstance(app_data, dict) and "Playtime" in app_data:
-                    try:
-                        minutes = int(app_data["Playtime"])
-                        # Keep the highest playtime if multiple users
-                        if appid not in playtime or minutes > playtime[appid]:
-                            playtime[appid] = minutes
-                    except ValueError:
-                        pass
+            content = config_file.read_bytes().decode("utf-8", "replace")
+
+            for appid, minutes in _extract_playtime(content).items():
+                # Keep the highest playtime if multiple users
+                if appid not in playtime or minutes > playtime[appid]:
+                    playtime[appid] = minutes
 
         except Exception:
             continue
@@ -204,91 +315,258 @@ def get_playtime_data(steam_root: Path) -> dict[str, int]:
     return playtime
 
 
-def get_installed_games(library_path: Path, playtime_data: dict[str, int] | None = None) -> list[SteamGame]:
+def _parse_appmanifest(content: str) -> dict[str, str]:
     """
-    Get all installed games from a Steam library folder.
+    Extract the AppState fields used by SteamGame from appmanifest content.
 
-    Parses appmanifest_*.acf files in the steamapps directory.
+    Scanning stops as soon as all of MANIFEST_KEYS have been found, so the
+    depot and user config sections further down are usually never read.
     """
-    steamapps = library_path / "steamapps"
-    if not steamapps.exists():
-        return []
+    fields: dict[str, str] = {}
+    depth = 0
+    pos = 0
+    key = None
+
+    while len(fields) < len(MANIFEST_KEYS):
+        quote = content.find('"', pos)
+        gap = content[pos:] if quote == -1 else content[pos:quote]
+
+        if "{" in gap or "}" in gap:
+            for char in gap:
+                if char == "{":
+                    depth += 1
+                    key = None
+                elif char == "}":
+                    depth -= 1
+                    key = None
+
+        if quote == -1:
+            break
+        end = content.find('"', quote + 1)
+        if end == -1:
+            break
+
+        value = content[quote + 1 : end]
+        pos = end + 1
+
+        if key is None:
+            key = value
+            continue
+
+        # AppState's own fields are at depth 1
+        if depth == 1 and key in MANIFEST_KEYS:
+            fields[key] = value
+        key = None
+
+    return fields
+
 
-    games = []
+def _list_dir_names(path: Path) -> set[str]:
+    """Return the names of all entries in a directory (empty if missing)."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
+def _cached_dir_names(path: Path) -> set[str]:
+    """Return the names of all entries in a directory, listing it only once."""
+    names = _dir_names_cache.get(path)
+    if names is None:
+        names = _dir_names_cache[path] = _list_dir_names(path)
+    return names
+
+
+def forget_uninstalled_game(game: SteamGame) -> None:
+    """
+    Drop an uninstalled game from the cached compatdata/shadercache listings.
+
+    The listings are otherwise only refreshed by a rescan, so its
+    has_compatdata/has_shadercache would keep returning True.
+    """
+    steamapps = game.library_path / "steamapps"
+    for path in (steamapps / "compatdata", steamapps / "shadercache"):
+        names = _dir_names_cache.get(path)
+        if names is not None:
+            names.discard(game.appid)
+
+
+def _parse_manifest(
+    manifest: str,
+    library_path: Path,
+    playtime_data: dict[str, int] | None,
+    common_dirs: set[str],
+) -> SteamGame | None:
+    """
+    Build a SteamGame from a single appmanifest file.
+
+    common_dirs comes from one listing of steamapps/common, so no per-game
+    stat is needed.
+
+    Returns None for runtime/tool entries, malformed manifests and games
+    whose install folder is missing.
+    """
+    try:
+        with open(manifest, "rb") as f:
+            content = f.read().decode("utf-8", "replace")
+        app_state = _parse_appmanifest(content)
+        if not app_state:
+            return None
+
+        appid = app_state.get("appid", "")
+        name = app_state.get("name", "Unknown")
+        install_dir = app_state.get("installdir", "")
+        size_str = app_state.get("SizeOnDisk", "0")
+
+        # Skip other runtime/tool entries (like Proton, Steam Linux Runtime)
+        if "Runtime" in name or "Proton" in name:
+            return None
 
-    for manifest in steamapps.glob("appmanifest_*.acf"):
         try:
-            content = manifest.read_text()
-            data = parse_vdf(content)
+            size_on_disk = int(size_str)
+        except ValueError:
+            size_on_disk = 0
 
-            app_state = data.get("AppState", {})
-            if not app_state:
-                continue
+        # Only include if game folder exists
+        if install_dir not in common_dirs:
+            return None
 
-            appid = app_state.get("appid", "")
-            name = app_state.get("name", "Unknown")
-            install_dir = app_state.get("installdir", "")
-            size_str = app_state.get("SizeOnDisk", "0")
+        return SteamGame(
+            appid=appid,
+            name=name,
+            install_dir=install_dir,
+            size_on_disk=size_on_disk,
+            library_path=library_path,
+            playtime_minutes=playtime_data.get(appid, 0) if playtime_data else 0,
+        )
 
-            # Skip runtime/tool entries (like Proton, Steam Linux Runtime)
-            if "Runtime" in name or "Proton" in name:
-                continue
+    except Exception:
+        # Skip malformed manifests
+        return None
 
-            try:
-                size_on_disk = int(size_str)
-            except ValueError:
-                size_on_disk = 0
-
-            # Check if compatdata and shadercache exist
-            compatdata_path = steamapps / "compatdata" / appid
-            shadercache_path = steamapps / "shadercache" / appid
-
-            game = SteamGame(
-                appid=appid,
-                name=name,
-                install_dir=install_dir,
-                size_on_disk=size_on_disk,
-                library_path=library_path,
-                has_compatdata=compatdata_path.exists(),
-                has_shadercache=shadercache_path.exists(),
-                playtime_minutes=playtime_data.get(appid, 0) if playtime_data else 0,
-            )
-
-            # Only include if game folder exists
-            if game.game_path.exists():
-                games.append(game)
 
-        except Exception:
-            # Skip malformed manifests
-            continue
+def get_installed_games(library_path: Path, playtime_data: dict[str, int] | None = None) -> list[SteamGame]:
+    """
+    Get all installed games from a Steam library folder.
+
+    Parses appmanifest_*.acf files in the steamapps directory. Manifests are
+    read in a thread pool since the work is dominated by file reads and stats.
+    """
+    steamapps = library_path / "steamapps"
+
+    try:
+        with os.scandir(steamapps) as entries:
+            manifests = [
+                entry.path
+                for entry in entries
+                if entry.name.startswith("appmanifest_")
+                and entry.name.endswith(".acf")
+                and entry.name[len("appmanifest_") : -len(".acf")] not in _NON_GAME_APPIDS
+                and entry.is_file()
+            ]
+    except OSError:
+        return []
+    parse = partial(
+        _parse_manifest,
+        library_path=library_path,
+        playtime_data=playtime_data,
+        common_dirs=_list_dir_names(steamapps / "common"),
+    )
+
+    # Forget compatdata/shadercache listings from a previous scan, they are
+    # listed again the first time a game's has_compatdata/has_shadercache
+    # is read
+    _dir_names_cache.pop(steamapps / "compatdata", None)
+    _dir_names_cache.pop(steamapps / "shadercache", None)
+
+    with ThreadPoolExecutor(max_workers=min(MAX_SCAN_WORKERS, len(manifests) or 1)) as executor:
+        games = [game for game in executor.map(parse, manifests) if game is not None]
 
     return sorted(games, key=lambda g: g.name.lower())
 
 
-def get_all_installed_games() -> list[SteamGame]:
-    """Get all installed games across all Steam libraries."""
-    steam_root = find_steam_root()
+def get_all_installed_games(steam_root: Path | None = None) -> list[SteamGame]:
+    """
+    Get all installed games across all Steam libraries.
+
+    Uses the given Steam root, or looks it up with find_steam_root().
+    """
+    if steam_root is None:
+        steam_root = find_steam_root()
     if steam_root is None:
         return []
 
     libraries = get_library_folders(steam_root)
     playtime_data = get_playtime_data(steam_root)
-    all_games = []
 
-    for library in libraries:
-        all_games.extend(get_installed_games(library, playtime_data))
+    with ThreadPoolExecutor(max_workers=min(MAX_SCAN_WORKERS, len(libraries) or 1)) as executor:
+        per_library = list(executor.map(lambda lib: get_installed_games(lib, playtime_data), libraries))
 
-    return sorted(all_games, key=lambda g: g.name.lower())
+    # Each library's list is already sorted by name
+    return list(heapq.merge(*per_library, key=lambda g: g.name.lower()))
 
 
 def is_steam_running() -> bool:
-    """Check if Steam is currently running."""
+    """
+    Check if Steam is currently running.
+
+    Scanning the process list is expensive, so the answer is reused for
+    STEAM_RUNNING_TTL seconds.
+    """
+    global _steam_running_cache
+
+    now = time.monotonic()
+    if _steam_running_cache is not None and now - _steam_running_cache[0] < STEAM_RUNNING_TTL:
+        return _steam_running_cache[1]
+
+    running = _scan_for_steam()
+    _steam_running_cache = (now, running)
+    return running
+
+
+def _scan_for_steam() -> bool:
+    """
+    Scan the process list for a Steam process.
+
+    On Linux this reads /proc/<pid>/comm directly, checking the pid Steam
+    records in ~/.steam/steam.pid first. Other platforms go through psutil.
+    """
+    if not os.path.isdir("/proc"):
+        return _scan_for_steam_psutil()
+
+    try:
+        pid_file = Path.home() / ".steam" / "steam.pid"
+        pid = pid_file.read_bytes().decode("ascii", errors="replace").strip()
+        if pid.isdigit() and _process_name(pid) in STEAM_PROCESS_NAMES:
+            return True
+    except OSError:
+        pass
+
+    for pid in os.listdir("/proc"):
+        if pid.isdigit() and _process_name(pid) in STEAM_PROCESS_NAMES:
+            return True
+    return False
+
+
+def _process_name(pid: str) -> str | None:
+    """Return the lowercased name of a process from /proc, if it still exists."""
+    try:
+        # Process names are raw bytes, not necessarily valid UTF-8
+        with open(f"/proc/{pid}/comm", "rb") as f:
+            return f.read().decode("utf-8", errors="replace").strip().lower()
+    except OSError:
+        return None
+
+
+def _scan_for_steam_psutil() -> bool:
+    """Scan the process list for a Steam process using psutil."""
     import psutil
 
     for proc in psutil.process_iter(["name"]):
         try:
             name = proc.info["name"]
-            if name and name.lower() in ("steam", "steam.exe"):
+            if name and name.lower() in STEAM_PROCESS_NAMES:
                 return True
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
             continue
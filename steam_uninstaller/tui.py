@@ -1,5 +1,7 @@
 """Textual TUI for Steam game uninstaller."""
 
+from pathlib import Path
+
 from textual import work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
@@ -17,21 +19,22 @@ from textual.widgets import (
     Static,
 )
 
-from .steam import SteamGame, get_all_installed_games, is_steam_running
+from .steam import (
+    SteamGame,
+    format_size,
+    get_all_installed_games,
+    is_steam_running,
+)
 from .uninstaller import (
     UninstallSummary,
+    calculate_sizes,
     calculate_total_size,
     uninstall_games,
 )
 
 
-def format_size(size: int) -> str:
-    """Return human-readable size string."""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size < 1024:
-            return f"{size:.1f} {unit}"
-        size /= 1024
-    return f"{size:.1f} PB"
+# Home directory, used to abbreviate library paths with "~"
+HOME_DIR = str(Path.home())
 
 
 class GameListScreen(Screen):
@@ -51,6 +54,31 @@ class GameListScreen(Screen):
         self.dry_run = dry_run
         self.selected: set[str] = set()  # Set of appids
         self.filtered_games: list[SteamGame] = games.copy()
+        self._last_filter = ""
+        # Lowercased names for case-insensitive filtering, by appid
+        self._lower_names: dict[str, str] = {g.appid: g.name.lower() for g in games}
+        # Display values for every column but the selection marker, by appid
+        self._row_cache: dict[str, tuple[str, str, str, str, str]] = {
+            game.appid: self._format_row(game) for game in games
+        }
+
+    @staticmethod
+    def _format_row(game: SteamGame) -> tuple[str, str, str, str, str]:
+        """Return the display values for a game's table row."""
+        proton = "Yes" if game.has_compatdata else "No"
+
+        # Shorten library path for display
+        lib_str = str(game.library_path)
+        if lib_str.startswith(HOME_DIR):
+            lib_str = "~" + lib_str[len(HOME_DIR) :]
+
+        return (
+            game.name,
+            game.format_size(),
+            game.format_playtime(),
+            proton,
+            lib_str,
+        )
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -91,27 +119,19 @@ class GameListScreen(Screen):
         self._populate_table()
         table.focus()
 
+    def _selection_marker(self, appid: str) -> str:
+        """Return the selection column value for a game."""
+        return "[bold green]X[/]" if appid in self.selected else " "
+
     def _populate_table(self) -> None:
         """Populate or refresh the table with games."""
         table = self.query_one("#games-table", DataTable)
         table.clear()
 
         for game in self.filtered_games:
-            selected = "[bold green]X[/]" if game.appid in self.selected else " "
-            proton = "Yes" if game.has_compatdata else "No"
-
-            # Shorten library path for display
-            lib_str = str(game.library_path)
-            if lib_str.startswith(str(game.library_path.home())):
-                lib_str = "~" + lib_str[len(str(game.library_path.home())) :]
-
             table.add_row(
-                selected,
-                game.name,
-                game.format_size(),
-                game.format_playtime(),
-                proton,
-                lib_str,
+                self._selection_marker(game.appid),
+                *self._row_cache[game.appid],
                 key=game.appid,
             )
 
@@ -136,13 +156,38 @@ class GameListScreen(Screen):
     def on_input_changed(self, event: Input.Changed) -> None:
         """Filter games based on search input."""
         filter_text = event.value.lower()
-        if filter_text:
+
+        if not filter_text.startswith(self._last_filter):
+            # The filter was widened, rebuild from the full list
+            self._last_filter = filter_text
             self.filtered_games = [
-                g for g in self.games if filter_text in g.name.lower()
+                g for g in self.games if filter_text in self._lower_names[g.appid]
             ]
+            self._populate_table()
+            return
+
+        # The filter was narrowed: only rows already shown can still match,
+        # so drop the ones that no longer do instead of rebuilding the table
+        self._last_filter = filter_text
+        table = self.query_one("#games-table", DataTable)
+        remaining = []
+        for game in self.filtered_games:
+            if filter_text in self._lower_names[game.appid]:
+                remaining.append(game)
+            else:
+                table.remove_row(game.appid)
+        self.filtered_games = remaining
+
+    def _toggle_game(self, appid: str) -> None:
+        """Toggle selection of a game and update its row in place."""
+        if appid in self.selected:
+            self.selected.discard(appid)
         else:
-            self.filtered_games = self.games.copy()
-        self._populate_table()
+            self.selected.add(appid)
+
+        table = self.query_one("#games-table", DataTable)
+        table.update_cell(appid, "selected", self._selection_marker(appid))
+        self._update_selection_info()
 
     def action_toggle_selection(self) -> None:
         """Toggle selection of current row."""
@@ -150,9 +195,6 @@ class GameListScreen(Screen):
         if table.cursor_row is None:
             return
 
-        # Save cursor position before repopulating
-        saved_row = table.cursor_row
-
         # Get the appid from the row key using coordinate_to_cell_key
         try:
             cell_key = table.coordinate_to_cell_key((table.cursor_row, 0))
@@ -160,28 +202,12 @@ class GameListScreen(Screen):
         except Exception:
             return
 
-        if appid in self.selected:
-            self.selected.discard(appid)
-        else:
-            self.selected.add(appid)
-
-        self._populate_table()
-
-        # Restore cursor position
-        try:
-            table.move_cursor(row=saved_row)
-        except Exception:
-            pass
+        self._toggle_game(appid)
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         """Handle row selection (Enter key or click)."""
         if event.row_key:
-            appid = str(event.row_key.value)
-            if appid in self.selected:
-                self.selected.discard(appid)
-            else:
-                self.selected.add(appid)
-            self._populate_table()
+            self._toggle_game(str(event.row_key.value))
 
     def action_select_all(self) -> None:
         """Select all visible games."""
@@ -231,7 +257,8 @@ class ConfirmScreen(Screen):
         super().__init__()
         self.games = games
         self.dry_run = dry_run
-        self.total_size = calculate_total_size(games)
+        self.sizes = calculate_sizes(games)
+        self.total_size = sum(self.sizes.values())
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -283,16 +310,24 @@ class ConfirmScreen(Screen):
 
     def action_proceed(self) -> None:
         """Start the uninstallation process."""
-        self.app.push_screen(ProgressScreen(self.games, dry_run=self.dry_run))
+        self.app.push_screen(
+            ProgressScreen(self.games, dry_run=self.dry_run, sizes=self.sizes)
+        )
 
 
 class ProgressScreen(Screen):
     """Screen showing uninstallation progress."""
 
-    def __init__(self, games: list[SteamGame], dry_run: bool = False):
+    def __init__(
+        self,
+        games: list[SteamGame],
+        dry_run: bool = False,
+        sizes: dict[Path, int] | None = None,
+    ):
         super().__init__()
         self.games = games
         self.dry_run = dry_run
+        self.sizes = sizes
         self.summary: UninstallSummary | None = None
 
     def compose(self) -> ComposeResult:
@@ -321,17 +356,18 @@ class ProgressScreen(Screen):
         progress = self.query_one("#progress-bar", ProgressBar)
         current = self.query_one("#current-game", Static)
 
-        def progress_callback(index: int, total: int, game: SteamGame) -> None:
-            self.app.call_from_thread(progress.update, progress=index)
+        def progress_callback(done: int, total: int, game: SteamGame) -> None:
+            self.app.call_from_thread(progress.update, progress=done)
             self.app.call_from_thread(
                 current.update,
-                f"[bold]Processing:[/] {game.name}",
+                f"[bold]Finished:[/] {game.name}",
             )
 
         self.summary = uninstall_games(
             self.games,
             dry_run=self.dry_run,
             progress_callback=progress_callback,
+            precomputed_sizes=self.sizes,
         )
 
         # Update progress to complete
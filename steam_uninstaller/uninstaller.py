@@ -1,15 +1,38 @@
 """Game uninstallation logic."""
 
 import logging
+import os
+import queue
 import shutil
+import stat
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
 
-from .steam import SteamGame
+from .steam import SteamGame, forget_uninstalled_game, format_size
 
 logger = logging.getLogger(__name__)
 
+# Default number of games uninstalled concurrently
+UNINSTALL_WORKERS = 4
+
+# Default number of threads listing directories when computing sizes
+SCAN_WORKERS = 8
+
+# Default number of threads deleting files, for one fast_rmtree() call or
+# shared by all the games of an uninstall_games() batch
+RMTREE_WORKERS = 8
+
+# Whether directories can be listed and emptied through file descriptors
+_USE_FD_FUNCTIONS = (
+    os.scandir in os.supports_fd
+    and os.unlink in os.supports_dir_fd
+    and os.stat in os.supports_dir_fd
+    and hasattr(os, "O_DIRECTORY")
+    and hasattr(os, "O_NOFOLLOW")
+)
+
 
 @dataclass
 class UninstallResult:
@@ -21,6 +44,16 @@ class UninstallResult:
     bytes_freed: int = 0
 
 
+@dataclass
+class _DeletionStats:
+    """What fast_rmtree() deleted under one top-level path."""
+
+    files_deleted: int = 0
+    dirs_deleted: int = 0
+    # 0 unless fast_rmtree() was asked to count bytes
+    bytes_freed: int = 0
+
+
 @dataclass
 class UninstallSummary:
     """Summary of batch uninstallation."""
@@ -37,78 +70,415 @@ class UninstallSummary:
 
     def format_bytes_freed(self) -> str:
         """Return human-readable size string."""
-        size = self.total_bytes_freed
-        for unit in ["B", "KB", "MB", "GB", "TB"]:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} PB"
+        return format_size(self.total_bytes_freed)
 
 
-def get_dir_size(path: Path) -> int:
-    """Calculate total size of a directory."""
-    if not path.exists():
-        return 0
+def _scan_dir(path: str) -> tuple[int, list[str]]:
+    """
+    Return the total size of the files directly in a directory, and its
+    subdirectories.
 
-    total = 0
+    os.scandir entries already know their type, so only regular files need
+    a stat() call. Where supported, the directory is listed through an fd so
+    those stat() calls are relative to it, as with os.fwalk.
+    """
     try:
-        for entry in path.rglob("*"):
-            if entry.is_file():
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW) if _USE_FD_FUNCTIONS else None
+    except OSError:
+        return 0, []
+
+    size = 0
+    subdirs = []
+    try:
+        with os.scandir(path if fd is None else fd) as entries:
+            # A single try around the loop rather than one per entry. When
+            # an entry can't be stat'ed, the loop resumes from the next one,
+            # as the iterator keeps its position (and is closed for good if
+            # listing the directory itself fails).
+            while True:
                 try:
-                    total += entry.stat().st_size
-                except (OSError, PermissionError):
-                    pass
-    except (OSError, PermissionError):
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(os.path.join(path, entry.name))
+                        elif entry.is_file(follow_symlinks=False):
+                            size += entry.stat(follow_symlinks=False).st_size
+                    break
+                except OSError:
+                    continue
+    except OSError:
         pass
+    finally:
+        if fd is not None:
+            os.close(fd)
 
-    return total
+    return size, subdirs
 
 
-def get_game_paths(game: SteamGame) -> list[tuple[Path, str]]:
+def _walk_trees(
+    executor: ThreadPoolExecutor,
+    roots: list[str],
+    task: Callable[[int, str], object],
+    handle: Callable[[int, Future], list[str]],
+) -> None:
     """
-    Get all paths that need to be deleted for a game.
+    Run a task on every directory of several trees.
 
-    Returns list of (path, description) tuples.
+    Each directory is a separate executor task, called with the index of
+    its tree and its path. handle is called on this thread with the same
+    index and the finished future of each directory, and returns the
+    subdirectories to run the task on next.
     """
-    paths = []
+    # Finished directories, with the index of the tree they belong to
+    done: queue.SimpleQueue[tuple[int, Future]] = queue.SimpleQueue()
+
+    def submit(i: int, path: str) -> None:
+        future = executor.submit(task, i, path)
+        future.add_done_callback(lambda f: done.put((i, f)))
+
+    for i, root in enumerate(roots):
+        submit(i, root)
+    pending = len(roots)
+    while pending:
+        i, future = done.get()
+        subdirs = handle(i, future)
+        for subdir in subdirs:
+            submit(i, subdir)
+        pending += len(subdirs) - 1
+
+
+def get_dir_sizes(paths: list[Path], workers: int = SCAN_WORKERS) -> list[int]:
+    """
+    Calculate the total size of several directories.
+
+    All the trees are walked by one pool of threads, each directory being
+    listed as a separate task.
+    """
+    sizes = [0] * len(paths)
+    if not paths:
+        return sizes
+
+    def add(i: int, future: Future) -> list[str]:
+        size, subdirs = future.result()
+        sizes[i] += size
+        return subdirs
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        _walk_trees(
+            executor,
+            [os.fspath(path) for path in paths],
+            lambda i, path: _scan_dir(path),
+            add,
+        )
 
-    # Manifest file (must exist)
-    paths.append((game.manifest_path, "manifest"))
+    return sizes
+
+
+def get_dir_size(path: Path) -> int:
+    """Calculate total size of a directory."""
+    return get_dir_sizes([path])[0]
+
+
+def _clear_dir(path: str, count_bytes: bool = False) -> tuple[int, int, list[str]]:
+    """
+    Delete everything but subdirectories in a directory.
+
+    Files are unlinked relative to an fd of the directory, so the kernel
+    doesn't have to resolve the full path again for every file.
+
+    Returns the number of deleted entries, the total size of the deleted
+    regular files (0 unless count_bytes is True) and the subdirectories.
+    """
+    deleted = 0
+    size = 0
+    subdirs = []
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW)
+    try:
+        with os.scandir(fd) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(os.path.join(path, entry.name))
+                    continue
+                if count_bytes and entry.is_file(follow_symlinks=False):
+                    size += entry.stat(follow_symlinks=False).st_size
+                os.unlink(entry.name, dir_fd=fd)
+                deleted += 1
+    finally:
+        os.close(fd)
+    return deleted, size, subdirs
+
+
+def fast_rmtree(
+    path: Path,
+    workers: int = RMTREE_WORKERS,
+    count_bytes: bool = False,
+) -> _DeletionStats:
+    """
+    Recursively delete a directory, like shutil.rmtree.
+
+    Directories are emptied concurrently by a pool of worker threads, then
+    removed bottom-up once all their files are gone. Falls back to
+    shutil.rmtree on platforms without fd-relative file functions.
+
+    With count_bytes, the size of each file is read just before it is
+    deleted, so the tree doesn't need a separate get_dir_size() walk.
+
+    Returns the deletion stats. bytes_freed is 0 unless count_bytes is
+    True, and the file and directory counts aren't tracked by the
+    shutil.rmtree fallback.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return _rmtrees([(path, count_bytes)], executor)[0]
+
+
+def _rmtrees(
+    trees: list[tuple[Path, bool]],
+    executor: ThreadPoolExecutor,
+) -> list[_DeletionStats]:
+    """
+    Recursively delete several directories, as fast_rmtree() does.
+
+    trees holds (path, count_bytes) pairs. All the trees are emptied at once
+    by the executor's threads, which may be shared with other callers; this
+    thread only collects the results and removes the directories.
+
+    If a tree can't be deleted, the error is raised once the other trees
+    are done, with a deleted_stats attribute mapping the index of each tree
+    that was fully deleted to its stats.
+
+    Returns the deletion stats of each tree.
+    """
+    if not _USE_FD_FUNCTIONS:
+        stats = []
+        for path, count_bytes in trees:
+            try:
+                size = get_dir_size(path) if count_bytes else 0
+                shutil.rmtree(path)
+            except Exception as e:
+                e.deleted_stats = dict(enumerate(stats))
+                raise
+            stats.append(_DeletionStats(bytes_freed=size))
+        return stats
+
+    roots = [os.fspath(path) for path, _ in trees]
+    for root in roots:
+        if os.path.islink(root):
+            # Same guard as shutil.rmtree, never delete through a symlink
+            raise OSError(f"Cannot call rmtree on a symbolic link: {root}")
+
+    stats = [_DeletionStats() for _ in trees]
+    # Every directory found in each tree, each one listed after its parent
+    dirs = [[root] for root in roots]
+
+    # First error of each tree that couldn't be fully emptied
+    errors: dict[int, Exception] = {}
+
+    def add(i: int, future: Future) -> list[str]:
+        try:
+            deleted, size, subdirs = future.result()
+        except Exception as e:
+            # Let the other trees finish before raising
+            errors.setdefault(i, e)
+            return []
+        stats[i].files_deleted += deleted
+        stats[i].bytes_freed += size
+        dirs[i].extend(subdirs)
+        return subdirs
+
+    _walk_trees(
+        executor,
+        roots,
+        lambda i, path: _clear_dir(path, trees[i][1]),
+        add,
+    )
 
-    # Game installation folder
-    if game.game_path.exists():
-        paths.append((game.game_path, "game files"))
+    for i, (tree_stats, tree_dirs) in enumerate(zip(stats, dirs)):
+        if i in errors:
+            continue
+        for directory in reversed(tree_dirs):
+            os.rmdir(directory)
+        tree_stats.dirs_deleted = len(tree_dirs)
+
+    if errors:
+        error = errors[min(errors)]
+        error.deleted_stats = {
+            i: tree_stats for i, tree_stats in enumerate(stats) if i not in errors
+        }
+        raise error
+
+    return stats
+
+
+def _stat(path: str, dir_fd: int | None = None) -> os.stat_result | None:
+    """Return the stat result of a path, or None if it doesn't exist."""
+    try:
+        return os.stat(path, dir_fd=dir_fd)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _open_steamapps_fds(games: list[SteamGame]) -> dict[Path, int]:
+    """
+    Open the steamapps directory of each library the games belong to.
+
+    Returns a dict mapping steamapps path -> directory fd, to be closed by
+    the caller. Empty on platforms without fd-relative file functions.
+    """
+    fds: dict[Path, int] = {}
+    if not _USE_FD_FUNCTIONS:
+        return fds
+
+    for steamapps in {game.library_path / "steamapps" for game in games}:
+        try:
+            fds[steamapps] = os.open(steamapps, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            # Fall back to absolute paths for this library
+            pass
+
+    return fds
+
+
+def get_game_paths(
+    game: SteamGame,
+    steamapps_fd: int | None = None,
+) -> list[tuple[Path, str, os.stat_result]]:
+    """
+    Get all paths that need to be deleted for a game.
+
+    Each candidate is stat'ed exactly once, and only existing paths are
+    returned. With steamapps_fd (an fd of the game's steamapps directory),
+    paths are stat'ed relative to it instead of being resolved from /.
+
+    Returns list of (path, description, stat result) tuples.
+    """
+    # Candidates relative to steamapps, a Path is only built for the ones
+    # that exist
+    candidates = [
+        (f"appmanifest_{game.appid}.acf", "manifest"),
+        (os.path.join("common", game.install_dir), "game files"),
+    ]
 
     # Proton compatibility data
-    if game.has_compatdata and game.compatdata_path.exists():
-        paths.append((game.compatdata_path, "Proton data"))
+    if game.has_compatdata:
+        candidates.append((os.path.join("compatdata", game.appid), "Proton data"))
 
     # Shader cache
-    if game.has_shadercache and game.shadercache_path.exists():
-        paths.append((game.shadercache_path, "shader cache"))
+    if game.has_shadercache:
+        candidates.append((os.path.join("shadercache", game.appid), "shader cache"))
+
+    steamapps = game.library_path / "steamapps"
+    root = os.fspath(steamapps)
+    paths = []
+    for name, description in candidates:
+        if steamapps_fd is None:
+            path_stat = _stat(os.path.join(root, name))
+        else:
+            path_stat = _stat(name, dir_fd=steamapps_fd)
+        if path_stat is not None:
+            paths.append((steamapps / name, description, path_stat))
 
     return paths
 
 
-def calculate_total_size(games: list[SteamGame]) -> int:
-    """Calculate total size that will be freed by uninstalling games."""
-    total = 0
+def calculate_sizes(games: list[SteamGame]) -> dict[Path, int]:
+    """
+    Calculate the size of each directory that uninstalling games will delete.
+
+    The result can be passed to uninstall_games() as precomputed_sizes so the
+    directories don't have to be walked a second time.
+    """
+    sizes = {}
+    dirs = []
     for game in games:
         # Use reported size from manifest
-        total += game.size_on_disk
+        sizes[game.game_path] = game.size_on_disk
 
-        # Add compatdata size if exists
         if game.has_compatdata:
-            total += get_dir_size(game.compatdata_path)
-
-        # Add shadercache size if exists
+            dirs.append(game.compatdata_path)
         if game.has_shadercache:
-            total += get_dir_size(game.shadercache_path)
+            dirs.append(game.shadercache_path)
+
+    # Walk all compatdata and shadercache directories at once
+    sizes.update(zip(dirs, get_dir_sizes(dirs)))
+    return sizes
+
+
+def calculate_total_size(games: list[SteamGame]) -> int:
+    """Calculate total size that will be freed by uninstalling games."""
+    return sum(calculate_sizes(games).values())
+
+
+def _plan_uninstall(
+    game: SteamGame,
+    precomputed_sizes: dict[Path, int] | None = None,
+    dry_run: bool = False,
+    steamapps_fd: int | None = None,
+) -> list[tuple[Path, str, int | None, bool]]:
+    """
+    Work out what uninstalling a game will delete, without deleting anything.
 
-    return total
+    The game folder's size is taken from its manifest. Other directories
+    have their size left as None when it isn't known yet, for
+    fast_rmtree() to measure while deleting; dry runs walk them instead.
+
+    Returns list of (path, description, size, is_dir) tuples.
+    """
+    game_path = game.game_path
+    plan = []
+    for path, description, path_stat in get_game_paths(game, steamapps_fd):
+        is_dir = stat.S_ISDIR(path_stat.st_mode)
+
+        # Calculate size before deletion
+        if not is_dir:
+            size = path_stat.st_size
+        elif precomputed_sizes and path in precomputed_sizes:
+            size = precomputed_sizes[path]
+        elif path == game_path:
+            # Use reported size from manifest
+            size = game.size_on_disk
+        elif dry_run:
+            size = get_dir_size(path)
+        else:
+            size = None
+
+        plan.append((path, description, size, is_dir))
+
+    return plan
+
+
+def _record_deletion(
+    path: Path,
+    description: str,
+    size: int | None,
+    stats: _DeletionStats,
+    log_deletions: bool,
+) -> int:
+    """
+    Log a deleted path with its stats.
+
+    Returns the number of bytes freed, taken from the stats when the size
+    wasn't known beforehand.
+    """
+    if size is None:
+        size = stats.bytes_freed
+    if log_deletions:
+        logger.info(
+            "Deleted %s: %s (%d files, %d directories, %s)",
+            description,
+            path,
+            stats.files_deleted,
+            stats.dirs_deleted,
+            format_size(size),
+        )
+    return size
 
 
-def uninstall_game(game: SteamGame, dry_run: bool = False) -> UninstallResult:
+def uninstall_game(
+    game: SteamGame,
+    dry_run: bool = False,
+    precomputed_sizes: dict[Path, int] | None = None,
+    steamapps_fd: int | None = None,
+    executor: ThreadPoolExecutor | None = None,
+) -> UninstallResult:
     """
     Uninstall a single game.
 
@@ -121,32 +491,76 @@ def uninstall_game(game: SteamGame, dry_run: bool = False) -> UninstallResult:
     Args:
         game: The game to uninstall
         dry_run: If True, don't actually delete anything
+        precomputed_sizes: Directory sizes from calculate_sizes(), used
+            instead of walking those directories again
+        steamapps_fd: Open fd of the game's steamapps directory, used to
+            stat and unlink paths relative to it
+        executor: Pool emptying the game's directories, shared with the
+            other games of a batch; one with RMTREE_WORKERS threads is
+            created when not given
 
     Returns:
         UninstallResult with success status and details
     """
     bytes_freed = 0
-    paths_to_delete = get_game_paths(game)
+    # Checked once per game rather than per deleted path
+    log_deletions = logger.isEnabledFor(logging.INFO)
 
     try:
-        for path, description in paths_to_delete:
-            if not path.exists():
-                continue
-
-            # Calculate size before deletion
-            if path.is_file():
-                size = path.stat().st_size
-            else:
-                size = get_dir_size(path)
-
-            if not dry_run:
-                if path.is_file():
+        plan = _plan_uninstall(game, precomputed_sizes, dry_run, steamapps_fd)
+
+        if dry_run:
+            for path, description, size, _ in plan:
+                bytes_freed += size
+                if log_deletions:
+                    logger.info("Deleted %s: %s", description, path)
+        else:
+            # The manifest goes first, so an interrupted uninstall leaves
+            # the game listed as not installed rather than broken. Each path
+            # is counted as soon as it is gone, so a failed uninstall still
+            # reports what it freed.
+            trees = []
+            for path, description, size, is_dir in plan:
+                if is_dir:
+                    trees.append((path, description, size))
+                    continue
+                if steamapps_fd is None:
                     path.unlink()
                 else:
-                    shutil.rmtree(path)
+                    os.unlink(
+                        path.relative_to(game.library_path / "steamapps"),
+                        dir_fd=steamapps_fd,
+                    )
+                bytes_freed += _record_deletion(
+                    path,
+                    description,
+                    size,
+                    _DeletionStats(files_deleted=1, bytes_freed=size),
+                    log_deletions,
+                )
+
+            # The game's directories are independent trees (compatdata and
+            # the game files may even be on different drives), so they are
+            # all emptied at once
+            to_delete = [(path, size is None) for path, _, size in trees]
+            try:
+                if not trees:
+                    tree_stats = []
+                elif executor is None:
+                    with ThreadPoolExecutor(max_workers=RMTREE_WORKERS) as own_executor:
+                        tree_stats = _rmtrees(to_delete, own_executor)
+                else:
+                    tree_stats = _rmtrees(to_delete, executor)
+            except Exception as e:
+                # Count the trees that were deleted before the failure
+                for i, stats in sorted(getattr(e, "deleted_stats", {}).items()):
+                    bytes_freed += _record_deletion(*trees[i], stats, log_deletions)
+                raise
+
+            for tree, stats in zip(trees, tree_stats):
+                bytes_freed += _record_deletion(*tree, stats, log_deletions)
 
-            bytes_freed += size
-            logger.info("Deleted %s: %s", description, path)
+            forget_uninstalled_game(game)
 
         return UninstallResult(
             game=game,
@@ -186,36 +600,76 @@ def uninstall_games(
     games: list[SteamGame],
     dry_run: bool = False,
     progress_callback: Callable[[int, int, SteamGame], None] | None = None,
+    max_workers: int = UNINSTALL_WORKERS,
+    precomputed_sizes: dict[Path, int] | None = None,
 ) -> UninstallSummary:
     """
     Uninstall multiple games.
 
+    Games are uninstalled concurrently by up to max_workers threads, since
+    their files are disjoint and deletion is I/O-bound.
+
     Args:
         games: List of games to uninstall
         dry_run: If True, don't actually delete anything
-        progress_callback: Called with (current_index, total, current_game)
+        progress_callback: Called with (finished_count, total, game) as
+            each game finishes
+        max_workers: Number of games to uninstall at once; 1 uninstalls
+            them one after the other
+        precomputed_sizes: Directory sizes from calculate_sizes(), used
+            instead of walking those directories again
 
     Returns:
-        UninstallSummary with overall results
+        UninstallSummary with overall results, in the order of games
     """
-    results = []
     total = len(games)
+    successful = 0
+    total_bytes = 0
 
-    for i, game in enumerate(games):
-        if progress_callback:
-            progress_callback(i, total, game)
-
-        result = uninstall_game(game, dry_run=dry_run)
-        results.append(result)
+    # Open each library's steamapps directory once, so manifests and the
+    # other per-game paths are resolved relative to it
+    steamapps_fds = _open_steamapps_fds(games)
 
-    successful = sum(1 for r in results if r.success)
-    failed = total - successful
-    total_bytes = sum(r.bytes_freed for r in results)
+    try:
+        # One bounded pool empties the directories of every game, so the
+        # number of deleting threads doesn't grow with max_workers
+        with (
+            ThreadPoolExecutor(max_workers=RMTREE_WORKERS) as rmtree_executor,
+            ThreadPoolExecutor(max_workers=max_workers) as executor,
+        ):
+            # Maps each future to the index of its game
+            futures = {
+                executor.submit(
+                    uninstall_game,
+                    game,
+                    dry_run=dry_run,
+                    precomputed_sizes=precomputed_sizes,
+                    steamapps_fd=steamapps_fds.get(game.library_path / "steamapps"),
+                    executor=rmtree_executor,
+                ): i
+                for i, game in enumerate(games)
+            }
+
+            # Progress is reported from this thread as games finish, so the
+            # callback never holds up the workers
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                if result.success:
+                    successful += 1
+                total_bytes += result.bytes_freed
+                if progress_callback:
+                    progress_callback(done_count, total, games[futures[future]])
+    finally:
+        for fd in steamapps_fds.values():
+            os.close(fd)
+
+    # Futures were submitted in the order of games
+    results = [future.result() for future in futures]
 
     return UninstallSummary(
         total_games=total,
         successful=successful,
-        failed=failed,
+        failed=total - successful,
         total_bytes_freed=total_bytes,
         results=results,
     )
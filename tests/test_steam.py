@@ -0,0 +1,243 @@
+"""Tests for the VDF scanners in steam.py."""
+
+import re
+
+import pytest
+
+from steam_uninstaller.steam import (
+    MANIFEST_KEYS,
+    _extract_playtime,
+    _parse_appmanifest,
+    get_playtime_data,
+    parse_vdf,
+)
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|\{|\}')
+
+
+def baseline_parse_vdf(content):
+    """The original regex-based parse_vdf, kept as a reference."""
+    result = {}
+    stack = [result]
+    current_key = None
+
+    for match in _TOKEN_RE.finditer(content):
+        token = match.group()
+
+        if token == "{":
+            if current_key is not None:
+                new_dict = {}
+                stack[-1][current_key] = new_dict
+                stack.append(new_dict)
+                current_key = None
+        elif token == "}":
+            if len(stack) > 1:
+                stack.pop()
+        else:
+            value = match.group(1)
+            if current_key is None:
+                current_key = value
+            else:
+                stack[-1][current_key] = value
+                current_key = None
+
+    return result
+
+LOCALCONFIG = """\
+"UserLocalConfigStore"
+{
+	"Broadcast"
+	{
+		"apps"
+		{
+			"20"
+			{
+				"Playtime"		"999"
+			}
+		}
+	}
+	"Software"
+	{
+		"Valve"
+		{
+			"Steam"
+			{
+				"apps"
+				{
+					"10"
+					{
+						"LastPlayed"		"1700000000"
+						"Playtime"		"120"
+						"cloud"
+						{
+							"Playtime"		"5"
+						}
+					}
+					"30"
+					{
+						"Playtime2wks"		"3"
+					}
+				}
+			}
+		}
+	}
+	"WebStorage"
+	{
+		"apps"		"{}"
+	}
+}
+"""
+
+
+def baseline_playtime(content):
+    """Playtimes as the original get_playtime_data read them, through parse_vdf."""
+    apps = (
+        baseline_parse_vdf(content)
+        .get("UserLocalConfigStore", {})
+        .get("Software", {})
+        .get("Valve", {})
+        .get("Steam", {})
+        .get("apps", {})
+    )
+    playtime = {}
+    for appid, app_data in apps.items():
+        if isinstance(app_data, dict) and "Playtime" in app_data:
+            try:
+                playtime[appid] = int(app_data["Playtime"])
+            except ValueError:
+                pass
+    return playtime
+
+
+def test_extract_playtime_reads_only_steam_apps_section():
+    assert _extract_playtime(LOCALCONFIG) == {"10": 120}
+
+
+def test_extract_playtime_without_steam_apps_section():
+    content = '"UserLocalConfigStore"\n{\n\t"apps"\n\t{\n\t\t"10" { "Playtime" "1" }\n\t}\n}\n'
+    assert _extract_playtime(content) == {}
+
+
+def test_get_playtime_data_keeps_highest_playtime(tmp_path):
+    for user, minutes in (("1", "120"), ("2", "90")):
+        config = tmp_path / "userdata" / user / "config"
+        config.mkdir(parents=True)
+        (config / "localconfig.vdf").write_text(LOCALCONFIG.replace('"120"', f'"{minutes}"'))
+
+    assert get_playtime_data(tmp_path) == {"10": 120}
+
+
+LIBRARYFOLDERS = """\
+"libraryfolders"
+{
+	"0"
+	{
+		"path"		"/home/user/.local/share/Steam"
+		"label"		""
+		"apps"
+		{
+			"228980"		"0"
+			"10"		"1200"
+		}
+	}
+	"1"
+	{
+		"path"		"/mnt/games/SteamLibrary"
+		"apps"
+		{
+		}
+	}
+}
+"""
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        LOCALCONFIG,
+        LIBRARYFOLDERS,
+        "",
+        '"key"\t\t"value"',
+        '"a" { "b" { "c" "d" } "e" "f" }',
+        '{ "a" "b" } } "c" { "d" "e"',
+        '"a" { "b" "c" } } "d" "e"',
+        '"a"{"b""c"}"d"{}',
+        '"a" { "b" "unterminated } }',
+        '"brace" "{" "in" "}"',
+    ],
+)
+def test_parse_vdf_matches_baseline(content):
+    assert parse_vdf(content) == baseline_parse_vdf(content)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        LOCALCONFIG,
+        LOCALCONFIG.replace('"120"', '"not a number"'),
+        LOCALCONFIG.replace('"Valve"', '"Other"'),
+        LIBRARYFOLDERS,
+        "",
+        '"UserLocalConfigStore" { "Software" { "Valve" { "Steam" { "apps" { '
+        '"1" { "Playtime" "5" } "2" { "Playtime" "7" } } } } } }',
+        '"UserLocalConfigStore" { "Software" { "Valve" { "Steam" { "apps" { '
+        '"1" { "Playtime" "5" "Playtime" "6" } "2" { "x" { "Playtime" "7" } } }',
+    ],
+)
+def test_extract_playtime_matches_baseline(content):
+    assert _extract_playtime(content) == baseline_playtime(content)
+
+
+APPMANIFEST = """\
+"AppState"
+{
+	"appid"		"10"
+	"universe"		"1"
+	"name"		"Counter-Strike"
+	"StateFlags"		"4"
+	"installdir"		"Half-Life"
+	"LastUpdated"		"1700000000"
+	"SizeOnDisk"		"563212934"
+	"InstalledDepots"
+	{
+		"11"
+		{
+			"manifest"		"4402946024329470193"
+			"size"		"563212934"
+		}
+	}
+	"UserConfig"
+	{
+		"language"		"english"
+		"name"		"Not the game name"
+	}
+}
+"""
+
+
+def baseline_appmanifest(content):
+    """The AppState fields as the original get_installed_games read them."""
+    app_state = baseline_parse_vdf(content).get("AppState", {})
+    return {key: value for key, value in app_state.items() if key in MANIFEST_KEYS}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        APPMANIFEST,
+        # Fields after the nested sections
+        APPMANIFEST.replace('\t"SizeOnDisk"\t\t"563212934"\n', "").replace(
+            "}\n}\n", '}\n\t"SizeOnDisk"\t\t"563212934"\n}\n'
+        ),
+        # Missing fields
+        APPMANIFEST.replace('"installdir"', '"other"'),
+        '"AppState"\n{\n}\n',
+        "",
+    ],
+)
+def test_parse_appmanifest_matches_baseline(content):
+    assert _parse_appmanifest(content) == baseline_appmanifest(content)
+
+
+def test_parse_vdf_matches_baseline_on_appmanifest():
+    assert parse_vdf(APPMANIFEST) == baseline_parse_vdf(APPMANIFEST)
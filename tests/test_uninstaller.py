@@ -0,0 +1,121 @@
+"""Tests for uninstaller.py."""
+
+import os
+
+import pytest
+
+from steam_uninstaller import uninstaller
+from steam_uninstaller.steam import SteamGame
+from steam_uninstaller.uninstaller import fast_rmtree, uninstall_game
+
+
+def make_tree(root):
+    """Create a small tree of 4 files (100 bytes in total) in 3 directories."""
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "top").write_bytes(b"x" * 10)
+    (root / "a" / "one").write_bytes(b"x" * 20)
+    (root / "a" / "b" / "two").write_bytes(b"x" * 30)
+    (root / "a" / "b" / "three").write_bytes(b"x" * 40)
+
+
+def make_game(library, appid="10", install_dir="Game"):
+    """Create the manifest and directories of a game in a fake library."""
+    steamapps = library / "steamapps"
+    (steamapps / "common" / install_dir / "bin").mkdir(parents=True)
+    (steamapps / "common" / install_dir / "bin" / "game").write_bytes(b"x" * 100)
+    (steamapps / "compatdata" / appid / "pfx").mkdir(parents=True)
+    (steamapps / "shadercache" / appid).mkdir(parents=True)
+    (steamapps / f"appmanifest_{appid}.acf").write_text(f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n}}\n')
+    return SteamGame(
+        appid=appid,
+        name="Game",
+        install_dir=install_dir,
+        size_on_disk=100,
+        library_path=library,
+    )
+
+
+def test_uninstall_game_updates_cached_listings(tmp_path):
+    game = make_game(tmp_path)
+    other = make_game(tmp_path, appid="20", install_dir="Other")
+    assert game.has_compatdata and game.has_shadercache
+
+    result = uninstall_game(game)
+
+    assert result.success
+    assert not game.has_compatdata and not game.has_shadercache
+    assert other.has_compatdata and other.has_shadercache
+
+
+def test_fast_rmtree_counts(tmp_path):
+    make_tree(tmp_path / "tree")
+
+    stats = fast_rmtree(tmp_path / "tree", count_bytes=True)
+
+    assert not (tmp_path / "tree").exists()
+    assert (stats.files_deleted, stats.dirs_deleted, stats.bytes_freed) == (4, 3, 100)
+
+
+def test_fast_rmtree_refuses_symlinked_root(tmp_path):
+    make_tree(tmp_path / "target")
+    (tmp_path / "link").symlink_to(tmp_path / "target")
+
+    with pytest.raises(OSError):
+        fast_rmtree(tmp_path / "link")
+
+    assert (tmp_path / "link").is_symlink()
+    assert (tmp_path / "target" / "a" / "b" / "three").exists()
+
+
+def test_fast_rmtree_unlinks_inner_symlinks(tmp_path):
+    make_tree(tmp_path / "target")
+    (tmp_path / "tree" / "sub").mkdir(parents=True)
+    (tmp_path / "tree" / "dir_link").symlink_to(tmp_path / "target")
+    (tmp_path / "tree" / "sub" / "file_link").symlink_to(tmp_path / "target" / "top")
+
+    stats = fast_rmtree(tmp_path / "tree", count_bytes=True)
+
+    assert not (tmp_path / "tree").exists()
+    assert (stats.files_deleted, stats.dirs_deleted, stats.bytes_freed) == (2, 2, 0)
+    assert (tmp_path / "target" / "top").read_bytes() == b"x" * 10
+    assert (tmp_path / "target" / "a" / "b" / "three").exists()
+
+
+def test_fast_rmtree_partial_failure(tmp_path, monkeypatch):
+    make_tree(tmp_path / "tree")
+    clear_dir = uninstaller._clear_dir
+
+    def failing_clear_dir(path, count_bytes=False):
+        if path.endswith(os.sep + "b"):
+            raise PermissionError(path)
+        return clear_dir(path, count_bytes)
+
+    monkeypatch.setattr(uninstaller, "_clear_dir", failing_clear_dir)
+
+    with pytest.raises(PermissionError):
+        fast_rmtree(tmp_path / "tree")
+
+    # Directories are only removed once the whole tree has been emptied
+    assert (tmp_path / "tree" / "a" / "b" / "three").exists()
+    assert not (tmp_path / "tree" / "top").exists()
+
+
+def test_uninstall_game_reports_bytes_freed_before_failure(tmp_path, monkeypatch):
+    game = make_game(tmp_path)
+    manifest_size = game.manifest_path.stat().st_size
+    clear_dir = uninstaller._clear_dir
+
+    def failing_clear_dir(path, count_bytes=False):
+        if path == os.fspath(game.compatdata_path):
+            raise PermissionError(path)
+        return clear_dir(path, count_bytes)
+
+    monkeypatch.setattr(uninstaller, "_clear_dir", failing_clear_dir)
+
+    result = uninstall_game(game)
+
+    assert not result.success
+    # The manifest, the game files (their manifest size) and the empty shader cache
+    assert result.bytes_freed == manifest_size + 100
+    assert not game.game_path.exists() and not game.shadercache_path.exists()
+    assert game.compatdata_path.exists()